@@ -5,7 +5,6 @@ from datetime import datetime
 
 import flask
 from flask_login import current_user, login_required
-from sqlalchemy.orm import with_polymorphic
 from sqlalchemy.sql import text
 from werkzeug.exceptions import Forbidden, Gone, NotFound
 
@@ -44,10 +43,9 @@ def get_build(request_id):
     :rtype: flask.Response
     :raise NotFound: if the request is not found
     """
-    # Create an alias class to load the polymorphic classes
-    poly_request = with_polymorphic(Request, '*')
-    query = poly_request.query.options(*get_request_query_options(verbose=True))
-    return flask.jsonify(query.get_or_404(request_id).to_json())
+    # Load the columns of all the polymorphic classes in the same query
+    query = Request.query.with_polymorphic('*').options(*get_request_query_options(verbose=True))
+    return flask.jsonify(query.filter(Request.id == request_id).first_or_404().to_json())
 
 
 @api_v1.route('/builds/<int:request_id>/logs')
@@ -92,9 +90,8 @@ def get_builds():
     verbose = str_to_bool(flask.request.args.get('verbose'))
     max_per_page = flask.current_app.config['IIB_MAX_PER_PAGE']
 
-    # Create an alias class to load the polymorphic classes
-    poly_request = with_polymorphic(Request, '*')
-    query = poly_request.query.options(*get_request_query_options(verbose=verbose))
+    # Load the columns of all the polymorphic classes in the same query
+    query = Request.query.with_polymorphic('*').options(*get_request_query_options(verbose=verbose))
     if state:
         RequestStateMapping.validate_state(state)
         state_int = RequestStateMapping.__members__[state].value
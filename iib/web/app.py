@@ -1,23 +1,22 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
+import importlib
 import logging
 import os
 
 from flask import Flask
 from flask.logging import default_handler
-from flask_login import LoginManager
-from flask_migrate import Migrate
-import kombu.exceptions
-from werkzeug.exceptions import default_exceptions
+from werkzeug.exceptions import HTTPException
 
 from iib.exceptions import ConfigError, IIBError, ValidationError
 from iib.web import db
-from iib.web.api_v1 import api_v1
-from iib.web.auth import user_loader, load_user_from_request
-from iib.web.docs import docs
-from iib.web.errors import json_error
 
-# Import the models here so that Alembic will be guaranteed to detect them
-import iib.web.models  # noqa: F401
+# The schema for the configuration of each queue in "IIB_GREENWAVE_CONFIG". This is defined once at
+# import time rather than every time the configuration is validated.
+_GREENWAVE_REQUIRED_PARAMS = frozenset(('decision_context', 'product_version', 'subject_type'))
+_GREENWAVE_SUPPORTED_SUBJECT_TYPE = 'koji_build'
+
+_MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+_PRODUCTION_CONFIG_FILE = '/etc/iib/settings.py'
 
 
 def load_config(app):
@@ -31,7 +30,7 @@ def load_config(app):
         default_config_obj = 'iib.web.config.DevelopmentConfig'
     else:
         default_config_obj = 'iib.web.config.ProductionConfig'
-        config_file = '/etc/iib/settings.py'
+        config_file = _PRODUCTION_CONFIG_FILE
     app.config.from_object(default_config_obj)
 
     if config_file and os.path.isfile(config_file):
@@ -46,37 +45,40 @@ def validate_api_config(config):
     :raises ConfigError: if the config is invalid
     """
     if config['IIB_GREENWAVE_CONFIG']:
-        defined_queue_names = set(config['IIB_USER_TO_QUEUE'].values())
-        invalid_greenwave_queues = set(config['IIB_GREENWAVE_CONFIG'].keys()) - defined_queue_names
+        # The keys view supports set operations directly, so there's no need to copy the queue
+        # names into intermediate sets
+        invalid_greenwave_queues = (
+            config['IIB_GREENWAVE_CONFIG'].keys() - config['IIB_USER_TO_QUEUE'].values()
+        )
         # The queue_name `None` is the configuration for the default Celery queue
         invalid_greenwave_queues.discard(None)
         if invalid_greenwave_queues:
             raise ConfigError(
                 f'The following queues are invalid in "IIB_GREENWAVE_CONFIG"'
-                f': {", ".join(invalid_greenwave_queues)}'
+                f': {", ".join(sorted(invalid_greenwave_queues))}'
             )
 
-        required_params = {'decision_context', 'product_version', 'subject_type'}
         for queue_name, greenwave_config in config['IIB_GREENWAVE_CONFIG'].items():
-            defined_params = set(greenwave_config.keys())
-
-            missing_params = required_params - defined_params
-            if missing_params:
+            # Only compute the differences when the config is invalid and an error is raised
+            if not _GREENWAVE_REQUIRED_PARAMS.issubset(greenwave_config):
+                missing_params = _GREENWAVE_REQUIRED_PARAMS - greenwave_config.keys()
                 raise ConfigError(
-                    f'Missing required params {", ".join(missing_params)} for queue {queue_name} '
-                    'in "IIB_GREENWAVE_CONFIG"'
+                    f'Missing required params {", ".join(sorted(missing_params))} for queue '
+                    f'{queue_name} in "IIB_GREENWAVE_CONFIG"'
                 )
 
-            invalid_params = defined_params - required_params
-            if invalid_params:
+            # At this point all the required params are defined, so any additional key is invalid
+            if len(greenwave_config) != len(_GREENWAVE_REQUIRED_PARAMS):
+                invalid_params = greenwave_config.keys() - _GREENWAVE_REQUIRED_PARAMS
                 raise ConfigError(
-                    f'Invalid params {", ".join(invalid_params)} for queue {queue_name} '
+                    f'Invalid params {", ".join(sorted(invalid_params))} for queue {queue_name} '
                     'in "IIB_GREENWAVE_CONFIG"'
                 )
 
-            if greenwave_config['subject_type'] != 'koji_build':
+            if greenwave_config['subject_type'] != _GREENWAVE_SUPPORTED_SUBJECT_TYPE:
                 raise ConfigError(
-                    'IIB only supports gating for subject_type "koji_build". Invalid subject_type '
+                    'IIB only supports gating for subject_type '
+                    f'"{_GREENWAVE_SUPPORTED_SUBJECT_TYPE}". Invalid subject_type '
                     f'{greenwave_config["subject_type"]} defined for queue '
                     f'{queue_name} in "IIB_GREENWAVE_CONFIG"'
                 )
@@ -113,11 +115,21 @@ def create_app(config_obj=None):  # pragma: no cover
         # Add the Flask handler that streams to WSGI stderr
         logger.addHandler(default_handler)
 
+    # These are imported here rather than at the module level since they pull in the whole web
+    # stack, which isn't needed by code that only imports this module for its helper functions
+    from flask_login import LoginManager
+    from flask_migrate import Migrate
+
+    from iib.web.api_v1 import api_v1
+    from iib.web.auth import user_loader, load_user_from_request
+    from iib.web.docs import docs
+
     # Initialize the database
     db.init_app(app)
+    # Import the models here so that Alembic will be guaranteed to detect them
+    importlib.import_module('iib.web.models')
     # Initialize the database migrations
-    migrations_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'migrations')
-    Migrate(app, db, directory=migrations_dir)
+    Migrate(app, db, directory=_MIGRATIONS_DIR)
     # Initialize Flask Login
     login_manager = LoginManager()
     login_manager.init_app(app)
@@ -126,10 +138,24 @@ def create_app(config_obj=None):  # pragma: no cover
 
     app.register_blueprint(docs)
     app.register_blueprint(api_v1, url_prefix='/api/v1')
-    for code in default_exceptions.keys():
-        app.register_error_handler(code, json_error)
+    _register_error_handlers(app)
+
+    return app
+
+
+def _register_error_handlers(app):
+    """
+    Register the error handlers that convert exceptions to JSON responses.
+
+    :param flask.Flask app: a Flask application object
+    """
+    import kombu.exceptions
+
+    from iib.web.errors import json_error
+
+    # Flask resolves error handlers through the exception's class hierarchy, so this handles
+    # every HTTP error code
+    app.register_error_handler(HTTPException, json_error)
     app.register_error_handler(IIBError, json_error)
     app.register_error_handler(ValidationError, json_error)
     app.register_error_handler(kombu.exceptions.KombuError, json_error)
-
-    return app
@@ -8,7 +8,7 @@ from flask import current_app, url_for
 from flask_login import UserMixin, current_user
 import sqlalchemy
 from sqlalchemy.ext.declarative import declared_attr
-from sqlalchemy.orm import joinedload, load_only, validates
+from sqlalchemy.orm import joinedload, load_only, selectinload, validates
 from werkzeug.exceptions import Forbidden
 
 from iib.exceptions import ValidationError
@@ -54,9 +54,8 @@ class RequestStateMapping(BaseEnum):
         :param str state: the state to validate
         :raises iib.exceptions.ValidationError: if the state is invalid
         """
-        state_names = cls.get_names()
-        if state not in state_names:
-            states = ', '.join(state_names)
+        if state not in cls.__members__:
+            states = ', '.join(cls.get_names())
             raise ValidationError(
                 f'{state} is not a valid build request state. Valid states are: {states}'
             )
@@ -82,6 +81,10 @@ class RequestTypeMapping(BaseEnum):
         return cls(num).name.replace('_', '-')
 
 
+# The valid request type numbers, used to validate Request.type without iterating over the enum
+_REQUEST_TYPE_NUMS = frozenset(request_type.value for request_type in RequestTypeMapping)
+
+
 class Architecture(db.Model):
     """An architecture associated with an image."""
 
@@ -91,6 +94,23 @@ class Architecture(db.Model):
     def __repr__(self):
         return '<Architecture name={0!r}>'.format(self.name)
 
+    @classmethod
+    def get_or_create(cls, name):
+        """
+        Get the architecture from the database and create it if it doesn't exist.
+
+        :param str name: the name of the architecture
+        :return: an Architecture object based on the input name; the Architecture object will be
+            added to the database session, but not committed, if it was created
+        :rtype: Architecture
+        """
+        arch = cls.query.filter_by(name=name).first()
+        if not arch:
+            arch = Architecture(name=name)
+            db.session.add(arch)
+
+        return arch
+
     @staticmethod
     def validate_architecture_json(arches):
         """
@@ -274,7 +294,8 @@ class Request(db.Model):
         :rtype: int
         :raises ValidationError: if the request type is invalid
         """
-        if not any(type_num == num.value for num in RequestTypeMapping):
+        # bool is a subclass of int, so check the exact type to avoid True being accepted as 1
+        if type(type_num) is not int or type_num not in _REQUEST_TYPE_NUMS:
             raise ValidationError(f'{type_num} is not a valid request type number')
         return type_num
 
@@ -298,11 +319,16 @@ class Request(db.Model):
                 )
             )
 
-        for s in ('complete', 'failed'):
-            # A complete or failed state cannot change states, but the state reason
-            # can be updated
-            if self.state and self.state.state_name == s and state != s:
-                raise ValidationError(f'A {self.state.state_name} request cannot change states')
+        # A complete or failed state cannot change states, but the state reason can be updated.
+        # The current state is referenced directly by request_state_id, so this doesn't require
+        # loading the state history.
+        current_state = self.state
+        if (
+            current_state
+            and current_state.state_name in RequestStateMapping.get_final_states()
+            and state != current_state.state_name
+        ):
+            raise ValidationError(f'A {current_state.state_name} request cannot change states')
 
         request_state = RequestState(state=state_int, state_reason=state_reason)
         self.states.append(request_state)
@@ -319,14 +345,11 @@ class Request(db.Model):
         :param str arch_name: the architecture to add
         :raises ValidationError: if the architecture is invalid
         """
-        arch = db.session.query(Architecture).filter_by(name=arch_name).first()
-        if not arch:
-            arch = Architecture(name=arch_name)
-            db.session.add(arch)
-            db.session.flush()
+        # Avoid querying the database when the architecture is already associated with the request
+        if any(arch.name == arch_name for arch in self.architectures):
+            return
 
-        if arch not in self.architectures:
-            self.architectures.append(arch)
+        self.architectures.append(Architecture.get_or_create(arch_name))
 
     @classmethod
     def from_json(cls, kwargs):
@@ -569,7 +592,12 @@ def get_request_query_options(verbose=False):
     # Tell SQLAlchemy to join on the relationships that are part of the JSON to avoid
     # additional SQL queries
     query_options = [
+        joinedload(Request.batch),
+        joinedload(Request.state),
         joinedload(Request.user),
+        # Collections are loaded with a separate SELECT ... IN query for all the requests to
+        # avoid multiplying the rows returned by the main query
+        selectinload(Request.architectures),
         joinedload(RequestAdd.binary_image),
         joinedload(RequestAdd.binary_image_resolved),
         joinedload(RequestAdd.bundles),
@@ -587,9 +615,7 @@ def get_request_query_options(verbose=False):
         joinedload(RequestRm.operators),
     ]
     if verbose:
-        query_options.append(joinedload(Request.states))
-    else:
-        query_options.append(joinedload(Request.state))
+        query_options.append(selectinload(Request.states))
 
     return query_options
 
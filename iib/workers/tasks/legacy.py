@@ -1,19 +1,28 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 # This file can be deleted once OMPS is retired
+import concurrent.futures
+import itertools
 import json
 import logging
 import os
-import shutil
 import tempfile
-
-import requests
+import zipfile
 
 from iib.exceptions import IIBError
-from iib.workers.api_utils import set_request_state
+from iib.workers.api_utils import get_requests_session, set_request_state
 from iib.workers.config import get_worker_config
 from iib.workers.tasks.utils import get_image_labels, retry, run_cmd
 
 log = logging.getLogger(__name__)
+# A shared session is used so that the connections to OMPS are reused between package pushes.
+# It's intentionally shared by the threads in export_legacy_packages: its connection pool is
+# thread-safe and holds up to 10 connections per host, which covers
+# _MAX_CONCURRENT_PACKAGE_PUSHES. Like the other IIB sessions, it retries connection errors with a
+# backoff. Those happen before the upload is sent, and a POST isn't retried after a read error or
+# an error status.
+requests_session = get_requests_session()
+# The maximum number of exported packages that are zipped and pushed to OMPS at the same time
+_MAX_CONCURRENT_PACKAGE_PUSHES = 8
 
 
 def export_legacy_packages(packages, request_id, rebuilt_index_image, cnr_token, organization):
@@ -30,16 +39,55 @@ def export_legacy_packages(packages, request_id, rebuilt_index_image, cnr_token,
     :raises IIBError: if the export of packages fails.
     """
     with tempfile.TemporaryDirectory(prefix='iib-') as temp_dir:
+        package_dirs = []
         for package in packages:
-            _opm_index_export(rebuilt_index_image, package, temp_dir)
-            package_dir = os.path.join(temp_dir, package)
+            # Export each package to its own directory since the manifests.zip file is created
+            # next to the exported package
+            package_base_dir = os.path.join(temp_dir, package)
+            os.mkdir(package_base_dir)
+            _opm_index_export(rebuilt_index_image, package, package_base_dir)
+            package_dir = os.path.join(package_base_dir, package)
+            # Verify every package before pushing anything so that a missing package doesn't
+            # leave the other packages pushed to the legacy app registry
             _verify_package_info(package_dir, rebuilt_index_image)
-            _zip_package(package_dir)
-            _push_package_manifest(package_dir, cnr_token, organization)
+            package_dirs.append(package_dir)
+
+        # Zipping and pushing the exported packages is mostly spent on compression and network
+        # I/O, which release the GIL, so the packages are processed concurrently
+        max_workers = min(len(package_dirs), _MAX_CONCURRENT_PACKAGE_PUSHES) or 1
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_zip_and_push_package, package_dir, cnr_token, organization)
+                for package_dir in package_dirs
+            ]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            except Exception:
+                # Don't push the packages that haven't started yet once one of them failed. The
+                # executor would otherwise run all of them before exiting the with block.
+                for future in futures:
+                    future.cancel()
+                raise
 
     set_request_state(request_id, 'in_progress', 'Back ported packages successfully pushed to OMPS')
 
 
+def _zip_and_push_package(package_dir, cnr_token, organization):
+    """
+    Zip and push an exported package to OMPS.
+
+    :param str package_dir: path to the exported package directory.
+    :param str cnr_token: the token required to push backported packages to the legacy
+        app registry via OMPS.
+    :param str organization: the organization name in the legacy app registry to which the
+        backported packages should be pushed to.
+    :raises IIBError: if the zipping or the push fails.
+    """
+    _zip_package(package_dir)
+    _push_package_manifest(package_dir, cnr_token, organization)
+
+
 def _get_base_dir_and_pkg_name(package_dir):
     """
     Get the base directory and the package name from package directory.
@@ -120,7 +168,7 @@ def _push_package_manifest(package_dir, cnr_token, organization):
     with open(f'{base_dir}/manifests.zip', 'rb') as fobj:
         files = {'file': (fobj.name, fobj)}
         log.info('Files are %s', files)
-        resp = requests.post(
+        resp = requests_session.post(
             f'{conf["iib_omps_url"]}{organization}/zipfile',
             headers={'Authorization': cnr_token},
             files=files,
@@ -173,8 +221,11 @@ def _verify_package_info(package_dir, from_index):
     log.info('Verifying package_name %s', package_name)
     # opm does not fail when the package is missing in the index image, hence we
     # check the number of generated files. If it's equal to 1, that means only an empty
-    # `package.yaml` file is generated and the package is missing
-    if len(os.listdir(package_dir)) == 1:
+    # `package.yaml` file is generated and the package is missing. Only the first two entries
+    # are read since that's enough to know, rather than listing the whole directory.
+    with os.scandir(package_dir) as entries:
+        num_entries = len(list(itertools.islice(entries, 2)))
+    if num_entries == 1:
         raise IIBError(f'package {package_name} is missing in index image {from_index}')
 
 
@@ -187,7 +238,13 @@ def _zip_package(package_dir):
     """
     base_dir, package_name = _get_base_dir_and_pkg_name(package_dir)
     try:
-        shutil.make_archive(f'{base_dir}/manifests', 'zip', package_dir)
+        # The archive is written directly with zipfile instead of shutil.make_archive, since the
+        # latter changes the current working directory of the whole process while archiving
+        with zipfile.ZipFile(f'{base_dir}/manifests.zip', 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for root, _, file_names in os.walk(package_dir):
+                for file_name in file_names:
+                    file_path = os.path.join(root, file_name)
+                    zip_file.write(file_path, os.path.relpath(file_path, package_dir))
     except Exception:
         log.exception('Unable to zip exported package: %s', package_name)
         raise IIBError(f'Unable to zip exported package for {package_name}')
@@ -29,6 +29,39 @@ def get_image_labels(pull_spec):
         full_pull_spec = pull_spec
     else:
         full_pull_spec = f'docker://{pull_spec}'
+
+    if '@' in full_pull_spec:
+        # Return a copy so that the caller can't modify the cached labels
+        return dict(_get_image_labels_by_digest(full_pull_spec))
+
+    return _get_image_labels(full_pull_spec)
+
+
+@functools.lru_cache(maxsize=512)
+def _get_image_labels_by_digest(full_pull_spec):
+    """
+    Get the labels from the image referenced by its digest.
+
+    The content referenced by a digest is immutable, so the labels are cached. This avoids
+    inspecting the same bundle image multiple times when processing a request.
+
+    :param str full_pull_spec: the pull specification of the image using its digest, including
+        the ``docker://`` transport
+    :return: the dictionary of the labels on the image
+    :rtype: dict
+    """
+    return _get_image_labels(full_pull_spec)
+
+
+def _get_image_labels(full_pull_spec):
+    """
+    Get the labels from the image.
+
+    :param str full_pull_spec: the pull specification of the image, including the ``docker://``
+        transport
+    :return: the dictionary of the labels on the image
+    :rtype: dict
+    """
     log.debug('Getting the labels from %s', full_pull_spec)
     return skopeo_inspect(full_pull_spec, '--config').get('config', {}).get('Labels', {})
 
@@ -3,6 +3,7 @@ import json
 from unittest import mock
 
 import pytest
+import sqlalchemy
 from sqlalchemy.exc import DisconnectionError
 
 from iib.web.models import Image, RequestAdd
@@ -122,6 +123,42 @@ def test_get_builds(app, auth_env, client, db):
     assert 'state_history' in rv_json['items'][0]
 
 
+@pytest.mark.parametrize('verbose', (True, False))
+def test_get_builds_query_count(verbose, app, auth_env, client, db):
+    # flask_login.current_user is used in RequestAdd.from_json, which requires a request context
+    with app.test_request_context(environ_base=auth_env):
+        for i in range(10):
+            data = {
+                'binary_image': 'quay.io/namespace/binary_image:latest',
+                'bundles': [f'quay.io/namespace/bundle:{i}'],
+                'from_index': f'quay.io/namespace/repo:{i}',
+            }
+            request = RequestAdd.from_json(data)
+            request.add_architecture('amd64')
+            db.session.add(request)
+        db.session.commit()
+    # Ensure nothing is served from the SQLAlchemy identity map
+    db.session.expire_all()
+
+    statements = []
+
+    def _record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(db.engine, 'before_cursor_execute', _record_statement)
+    try:
+        rv = client.get(f'/api/v1/builds?verbose={str(verbose).lower()}')
+    finally:
+        sqlalchemy.event.remove(db.engine, 'before_cursor_execute', _record_statement)
+
+    assert rv.status_code == 200
+    assert len(rv.json['items']) == 10
+    assert rv.json['items'][0]['arches'] == ['amd64']
+    # The requests, their architectures and in verbose mode their states are each loaded with a
+    # single query regardless of the number of requests
+    assert len(statements) == (3 if verbose else 2)
+
+
 def test_get_builds_invalid_state(app, client, db):
     rv = client.get('/api/v1/builds?state=is_it_lunch_yet%3F')
     assert rv.status_code == 400
@@ -1104,6 +1141,18 @@ def test_not_found(client):
     assert rv.json == {'error': 'The requested resource was not found'}
 
 
+def test_unknown_route(client):
+    rv = client.get('/api/v1/unknown')
+    assert rv.status_code == 404
+    assert rv.json == {'error': 'The requested resource was not found'}
+
+
+def test_method_not_allowed(client):
+    rv = client.delete('/api/v1/builds')
+    assert rv.status_code == 405
+    assert rv.json == {'error': 'The method is not allowed for the requested URL.'}
+
+
 @mock.patch('iib.web.api_v1.handle_regenerate_bundle_request')
 @mock.patch('iib.web.api_v1.messaging.send_message_for_state_change')
 def test_regenerate_bundle_success(mock_smfsc, mock_hrbr, db, auth_env, client):
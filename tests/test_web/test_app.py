@@ -1,9 +1,12 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
+import logging
 from unittest import mock
 
+from flask.logging import default_handler
 import pytest
 
-from iib.web.app import load_config, validate_api_config
+from iib.web.app import create_app, load_config, validate_api_config
+from iib.web.config import TestingConfig
 from iib.exceptions import ConfigError
 
 
@@ -48,6 +51,26 @@ def test_load_config_prod(mock_isfile, mock_getenv):
             },
             'The following queues are invalid in "IIB_GREENWAVE_CONFIG": patriots',
         ),
+        (
+            {
+                'IIB_GREENWAVE_CONFIG': {
+                    'patriots': {'subject_type': 'st', 'product_version': 'pv'},
+                    'buccaneers': {'subject_type': 'st', 'product_version': 'pv'},
+                },
+                'IIB_USER_TO_QUEUE': {'tbrady': 'not-patriots'},
+            },
+            'The following queues are invalid in "IIB_GREENWAVE_CONFIG": buccaneers, patriots',
+        ),
+        (
+            {
+                'IIB_GREENWAVE_CONFIG': {'iib-user': {'subject_type': 'st'}},
+                'IIB_USER_TO_QUEUE': {'msdhoni': 'iib-user'},
+            },
+            (
+                'Missing required params decision_context, product_version for queue iib-user '
+                'in "IIB_GREENWAVE_CONFIG"'
+            ),
+        ),
         (
             {
                 'IIB_GREENWAVE_CONFIG': {
@@ -65,11 +88,12 @@ def test_load_config_prod(mock_isfile, mock_getenv):
                         'product_version': 'pv',
                         'decision_context': 'dc',
                         'malicious': 'mal',
+                        'hacker': 'hack',
                     },
                 },
                 'IIB_USER_TO_QUEUE': {'msdhoni': 'iib-user'},
             },
-            'Invalid params malicious for queue iib-user in "IIB_GREENWAVE_CONFIG"',
+            'Invalid params hacker, malicious for queue iib-user in "IIB_GREENWAVE_CONFIG"',
         ),
         (
             {
@@ -92,3 +116,31 @@ def test_load_config_prod(mock_isfile, mock_getenv):
 def test_validate_api_config_failure_greenwave_params(config, error_msg):
     with pytest.raises(ConfigError, match=error_msg):
         validate_api_config(config)
+
+
+def test_validate_api_config_greenwave_success():
+    greenwave_config = {
+        'decision_context': 'dc',
+        'product_version': 'pv',
+        'subject_type': 'koji_build',
+    }
+    config = {
+        'IIB_GREENWAVE_CONFIG': {'iib-user': greenwave_config, None: greenwave_config},
+        'IIB_USER_TO_QUEUE': {'msdhoni': 'iib-user'},
+    }
+
+    validate_api_config(config)
+
+
+def test_create_app_additional_loggers_handler_added_once():
+    class Config(TestingConfig):
+        IIB_ADDITIONAL_LOGGERS = ['iib.test_create_app']
+
+    logger = logging.getLogger('iib.test_create_app')
+    try:
+        create_app(Config)
+        create_app(Config)
+
+        assert logger.handlers.count(default_handler) == 1
+    finally:
+        logger.removeHandler(default_handler)
@@ -47,6 +47,17 @@ def test_request_add_state_already_done(state, db, minimal_request):
         minimal_request.add_state('in_progress', 'Oops!')
 
 
+@pytest.mark.parametrize('state', ('complete', 'failed'))
+def test_request_add_state_already_done_update_reason(state, db, minimal_request):
+    minimal_request.add_state(state, 'Done')
+    db.session.commit()
+    minimal_request.add_state(state, 'Really done')
+    db.session.commit()
+
+    assert minimal_request.state.state_name == state
+    assert minimal_request.state.state_reason == 'Really done'
+
+
 def test_request_logs_expiration(app, db, minimal_request):
     minimal_request.add_state('in_progress', 'Starting things up')
     db.session.commit()
@@ -65,7 +76,16 @@ def test_get_type_names():
 
 @pytest.mark.parametrize(
     'type_num, is_valid',
-    [(0, True), (1, True), (2, True), (3, True), (5, False), ('1', False), (None, False)],
+    [
+        (0, True),
+        (1, True),
+        (2, True),
+        (3, True),
+        (5, False),
+        ('1', False),
+        (None, False),
+        (True, False),
+    ],
 )
 def test_request_type_validation(type_num, is_valid):
     if is_valid:
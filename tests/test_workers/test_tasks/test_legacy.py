@@ -1,6 +1,8 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 import json
+import os
 from unittest import mock
+import zipfile
 
 import pytest
 
@@ -39,62 +41,76 @@ def test_get_legacy_support_packages(
         mock_srs.assert_not_called()
 
 
-@mock.patch('os.listdir')
-def test_verify_package_info_missing_pkg(mock_listdir):
-    mock_listdir.return_value = ['package.yaml']
+def test_verify_package_info(tmpdir):
+    package_dir = tmpdir.mkdir('download-pkg')
+    package_dir.join('package.yaml').write('packageName: download-pkg')
+    package_dir.mkdir('1.0.0')
+
+    legacy._verify_package_info(str(package_dir), 'index:image')
+
+
+def test_verify_package_info_missing_pkg(tmpdir):
+    package_dir = tmpdir.mkdir('download-pkg')
+    package_dir.join('package.yaml').write('')
     with pytest.raises(
         IIBError, match='package download-pkg is missing in index image index:image'
     ):
-        legacy._verify_package_info('/some/dir/download-pkg', 'index:image')
+        legacy._verify_package_info(str(package_dir), 'index:image')
+
 
+def test_zip_package_success(tmpdir):
+    package_dir = tmpdir.mkdir('download-pkg')
+    package_dir.join('package.yaml').write('packageName: download-pkg')
+    package_dir.mkdir('1.0.0').join('csv.yaml').write('kind: ClusterServiceVersion')
 
-@mock.patch('shutil.make_archive')
-def test_zip_package_success(mock_shutil):
-    legacy._zip_package('something/download-pkg')
-    mock_shutil.assert_called_once_with('something/manifests', 'zip', 'something/download-pkg')
+    legacy._zip_package(str(package_dir))
 
+    with zipfile.ZipFile(str(tmpdir.join('manifests.zip'))) as zip_file:
+        assert sorted(zip_file.namelist()) == ['1.0.0/csv.yaml', 'package.yaml']
+        assert zip_file.read('package.yaml') == b'packageName: download-pkg'
 
-@mock.patch('shutil.make_archive')
-def test_zip_package_failure(mock_shutil):
-    mock_shutil.side_effect = AttributeError('Nothing works!')
+
+@mock.patch('iib.workers.tasks.legacy.zipfile.ZipFile')
+def test_zip_package_failure(mock_zipfile):
+    mock_zipfile.side_effect = AttributeError('Nothing works!')
     with pytest.raises(IIBError, match='Unable to zip exported package for download-pkg'):
         legacy._zip_package('something/download-pkg')
 
 
 @mock.patch('iib.workers.tasks.legacy.open')
-@mock.patch('iib.workers.tasks.legacy.requests.post')
+@mock.patch('iib.workers.tasks.legacy.requests_session')
 def test_push_package_manifest_success(mock_requests, mock_open):
-    mock_requests.return_value.ok = True
+    mock_requests.post.return_value.ok = True
     legacy._push_package_manifest('something/download-pkg', 'cnr_token', 'organization')
     mock_open.assert_called_once_with('something/manifests.zip', 'rb')
-    mock_requests.assert_called_once()
+    mock_requests.post.assert_called_once()
 
 
 @mock.patch('iib.workers.tasks.legacy.open')
-@mock.patch('iib.workers.tasks.legacy.requests.post')
+@mock.patch('iib.workers.tasks.legacy.requests_session')
 def test_push_package_manifest_failure(mock_requests, mock_open):
-    mock_requests.return_value.ok = False
-    mock_requests.return_value.json.return_value = {"message": "Unauthorized"}
+    mock_requests.post.return_value.ok = False
+    mock_requests.post.return_value.json.return_value = {"message": "Unauthorized"}
     expected = 'Push to organization in the legacy app registry was unsucessful: Unauthorized'
     with pytest.raises(IIBError, match=expected):
         legacy._push_package_manifest('something/download-pkg', 'cnr_token', 'organization')
     mock_open.assert_called_once_with('something/manifests.zip', 'rb')
-    mock_requests.assert_called_once()
+    mock_requests.post.assert_called_once()
 
 
 @mock.patch('iib.workers.tasks.legacy.open')
-@mock.patch('iib.workers.tasks.legacy.requests.post')
+@mock.patch('iib.workers.tasks.legacy.requests_session')
 def test_push_package_manifest_failure_invalid_json(mock_requests, mock_open):
-    mock_requests.return_value.ok = False
-    mock_requests.return_value.json.side_effect = json.JSONDecodeError('Invalid Json', '', 1)
-    mock_requests.return_value.text = 'Something went wrong'
+    mock_requests.post.return_value.ok = False
+    mock_requests.post.return_value.json.side_effect = json.JSONDecodeError('Invalid Json', '', 1)
+    mock_requests.post.return_value.text = 'Something went wrong'
     expected = (
         'Push to organization in the legacy app registry was unsucessful: Something went wrong'
     )
     with pytest.raises(IIBError, match=expected):
         legacy._push_package_manifest('something/download-pkg', 'cnr_token', 'organization')
     mock_open.assert_called_once_with('something/manifests.zip', 'rb')
-    mock_requests.assert_called_once()
+    mock_requests.post.assert_called_once()
 
 
 @mock.patch('iib.workers.tasks.legacy.run_cmd')
@@ -124,6 +140,55 @@ def test_export_legacy_packages(mock_oie, mock_srs, mock_ppm, mock_zp, mock_vpi)
     mock_srs.assert_called_once()
 
 
+@mock.patch('iib.workers.tasks.legacy._verify_package_info')
+@mock.patch('iib.workers.tasks.legacy._zip_package')
+@mock.patch('iib.workers.tasks.legacy._push_package_manifest')
+@mock.patch('iib.workers.tasks.legacy.set_request_state')
+@mock.patch('iib.workers.tasks.legacy._opm_index_export')
+def test_export_legacy_packages_multiple(mock_oie, mock_srs, mock_ppm, mock_zp, mock_vpi):
+    packages = ['etcd', 'prometheus']
+    legacy.export_legacy_packages(packages, 3, 'from:index', 'token', 'org')
+
+    assert mock_oie.call_count == 2
+    export_dirs = [mock_call[0][2] for mock_call in mock_oie.call_args_list]
+    # Each package must be exported to its own directory so that the manifests.zip files
+    # don't overwrite each other
+    assert [os.path.basename(export_dir) for export_dir in export_dirs] == packages
+    zipped_dirs = sorted(mock_call[0][0] for mock_call in mock_zp.call_args_list)
+    assert zipped_dirs == [
+        os.path.join(export_dir, package) for export_dir, package in zip(export_dirs, packages)
+    ]
+    assert mock_vpi.call_count == 2
+    assert mock_ppm.call_count == 2
+    mock_srs.assert_called_once()
+
+
+@mock.patch('iib.workers.tasks.legacy._verify_package_info')
+@mock.patch('iib.workers.tasks.legacy._zip_package')
+@mock.patch('iib.workers.tasks.legacy._push_package_manifest')
+@mock.patch('iib.workers.tasks.legacy.set_request_state')
+@mock.patch('iib.workers.tasks.legacy._opm_index_export')
+@pytest.mark.parametrize('failing_step', ('verify', 'push'))
+def test_export_legacy_packages_failure(
+    mock_oie, mock_srs, mock_ppm, mock_zp, mock_vpi, failing_step
+):
+    if failing_step == 'verify':
+        mock_vpi.side_effect = IIBError('package etcd is missing')
+        expected = 'package etcd is missing'
+    else:
+        mock_ppm.side_effect = IIBError('Push failed')
+        expected = 'Push failed'
+
+    with pytest.raises(IIBError, match=expected):
+        legacy.export_legacy_packages(['etcd', 'prometheus'], 3, 'from:index', 'token', 'org')
+
+    if failing_step == 'verify':
+        # A missing package must stop the export before anything is pushed
+        mock_zp.assert_not_called()
+        mock_ppm.assert_not_called()
+    mock_srs.assert_not_called()
+
+
 @pytest.mark.parametrize(
     'cnr_token_val, error_msg',
     (
@@ -17,6 +17,21 @@ def test_get_image_labels(mock_si):
     assert utils.get_image_labels('some-image:latest') == skopeo_rv['config']['Labels']
 
 
+@mock.patch('iib.workers.tasks.utils.skopeo_inspect')
+def test_get_image_labels_by_digest_cached(mock_si):
+    utils._get_image_labels_by_digest.cache_clear()
+    mock_si.return_value = {'config': {'Labels': {'some_label': 'value'}}}
+    pull_spec = 'some-image@sha256:123456'
+
+    labels = utils.get_image_labels(pull_spec)
+    assert labels == {'some_label': 'value'}
+    # Modifying the returned labels must not alter the cached labels
+    labels['some_label'] = 'changed'
+    assert utils.get_image_labels(f'docker://{pull_spec}') == {'some_label': 'value'}
+    mock_si.assert_called_once_with(f'docker://{pull_spec}', '--config')
+    utils._get_image_labels_by_digest.cache_clear()
+
+
 @pytest.mark.parametrize('config_exists', (True, False))
 @pytest.mark.parametrize('template_exists', (True, False))
 @mock.patch('os.path.expanduser')